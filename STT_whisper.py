@@ -5,21 +5,203 @@ Automatically detects when you start and stop speaking
 """
 
 import os
+import json
+import functools
+import hashlib
+import collections
+import concurrent.futures
+import queue
 import pyaudio
 import numpy as np
-import whisper
 import requests
 import threading
 import time
+import warnings
 from dotenv import load_dotenv
-from TTS_edge import EdgeTTSEngine
+
+# Prefer faster-whisper (CTranslate2, int8) when installed; fall back to OpenAI Whisper
+try:
+    from faster_whisper import WhisperModel
+except ImportError:
+    WhisperModel = None
+    import torch
+    import whisper
+
+try:
+    import webrtcvad
+except ImportError:
+    webrtcvad = None
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+try:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        import audioop  # stdlib C RMS; removed in Python 3.13
+except ImportError:
+    audioop = None
+
+try:
+    import sounddevice as sd
+except ImportError:
+    sd = None
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Load environment variables from .env file
 load_dotenv()
 
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+# C-accelerated JSON for the per-turn request body and SSE chunks when orjson is installed
+if orjson is not None:
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+else:
+    def _json_dumps(obj):
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+    _json_loads = json.loads
+
+if njit is not None:
+    @njit(cache=True)
+    def _level_exceeds(samples, threshold):
+        """Fused abs/sum/compare over an int16 chunk (JIT-compiled, cached on disk)"""
+        total = 0
+        for i in range(samples.size):
+            value = np.int64(samples[i])
+            total += value if value >= 0 else -value
+        return total > threshold * samples.size
+else:
+    _level_exceeds = None
+
+
+class _LRUCache:
+    """Small thread-safe in-process LRU of strings, optionally shared through Redis when REDIS_URL is set"""
+
+    def __init__(self, namespace, maxsize=128, ttl=3600):
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._items = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+        if redis is not None and os.getenv("REDIS_URL"):
+            self._redis = redis.Redis.from_url(os.getenv("REDIS_URL"), decode_responses=True)
+
+    def get(self, key):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+
+        if self._redis is not None:
+            try:
+                value = self._redis.get(f"{self.namespace}:{key}")
+            except redis.RedisError:
+                return None
+            if value is not None:
+                self._remember(key, value)
+            return value
+        return None
+
+    def put(self, key, value):
+        self._remember(key, value)
+        if self._redis is not None:
+            try:
+                self._redis.setex(f"{self.namespace}:{key}", self.ttl, value)
+            except redis.RedisError:
+                pass
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+
+_whisper_lock = threading.Lock()
+
+
+def _load_quantized_whisper(name):
+    """Load Whisper on CPU with int8 dynamic-quantized Linear layers, reusing a quantized copy saved on disk"""
+    cache_path = os.path.join(os.path.expanduser("~"), ".cache", "whisper", f"{name}-qint8.pt")
+    if os.path.exists(cache_path):
+        try:
+            model = torch.load(cache_path, weights_only=False)
+            # Older caches held an unquantized model; only reuse one with int8 layers
+            if any(isinstance(module, torch.ao.nn.quantized.dynamic.Linear) for module in model.modules()):
+                return model
+            print("⚠️ Quantized Whisper cache has no int8 layers, re-quantizing")
+        except Exception as e:
+            print(f"⚠️ Could not load quantized Whisper cache, re-quantizing: {e}")
+
+    model = whisper.load_model(name, device="cpu")
+
+    # Whisper builds its layers from a whisper.model.Linear subclass, which quantize_dynamic skips
+    # (it matches exact types). That subclass only casts weights to the input dtype, a no-op in fp32
+    # on CPU, so turn the layers back into plain nn.Linear to let them be quantized
+    for module in model.modules():
+        if type(module) is whisper.model.Linear:
+            module.__class__ = torch.nn.Linear
+    model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    quantized = sum(isinstance(module, torch.ao.nn.quantized.dynamic.Linear) for module in model.modules())
+    if not quantized:
+        print("⚠️ No Whisper layers were quantized, using the fp32 model")
+        return model
+    print(f"⚙️ Quantized {quantized} Whisper Linear layers to int8")
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        torch.save(model, cache_path)
+    except Exception as e:
+        print(f"⚠️ Could not save quantized Whisper cache: {e}")
+    return model
+
+
+@functools.lru_cache(maxsize=None)
+def _get_whisper(name):
+    """Load a Whisper model once and share it between all ContinuousVoiceChat instances"""
+    if WhisperModel is not None:
+        print("Loading Whisper (faster-whisper, int8)...")
+        model = WhisperModel(name, device="cpu", compute_type="int8", cpu_threads=os.cpu_count() or 0)
+        # One inference on a second of silence so the first real utterance doesn't pay the setup cost
+        segments, _ = model.transcribe(np.zeros(16000, dtype=np.float32), beam_size=1, language="en")
+        list(segments)
+        return model
+
+    print("Loading Whisper...")
+    if torch.cuda.is_available():
+        model = whisper.load_model(name)
+    else:
+        model = _load_quantized_whisper(name)
+
+    # Compile the encoder (the CPU hot spot) and pay the one-time compile cost before the user speaks
+    if hasattr(torch, "compile"):
+        try:
+            print("⚙️ Compiling Whisper encoder (one-time warmup)...")
+            model.encoder = torch.compile(model.encoder, mode="reduce-overhead")
+            model.transcribe(np.zeros(16000, dtype=np.float32), fp16=False)
+        except Exception as e:
+            print(f"⚠️ Encoder compilation failed, using eager mode: {e}")
+            model.encoder = getattr(model.encoder, "_orig_mod", model.encoder)
+    return model
+
 
 class ContinuousVoiceChat:
-    def __init__(self, api_key=None, enable_voice_response=True, voice="en-US-AriaNeural"):
+    def __init__(self, api_key=None, enable_voice_response=True, voice="en-US-AriaNeural", full_duplex=False,
+                 enable_cache=True, http_session=None):
         # Get API key from .env file
         self.api_key = api_key or os.getenv('OPENROUTER_API_KEY')
 
@@ -29,25 +211,75 @@ class ContinuousVoiceChat:
                              "2. Add your OpenRouter API key to the .env file\n"
                              "3. Make sure .env file is in the same directory as this script")
 
+        self.llm_model = "deepseek/deepseek-r1:free"
+        # Fixed part of every chat request; only the model and messages are filled in per call
+        self._chat_payload_base = {"temperature": 0.7, "max_tokens": 800, "stream": True}
+
+        # Persistent HTTP session so the TCP/TLS connection to OpenRouter is reused across turns
+        # (pass http_session to share one that the caller owns and closes)
+        self._owns_http = http_session is None
+        self.http = requests.Session() if http_session is None else http_session
+        self.http.headers.update({
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        })
+
+        # Repeated audio/prompts are answered from cache (set enable_cache=False for non-deterministic use)
+        self.enable_cache = enable_cache
+        self._transcript_cache = _LRUCache("voice-ai:transcript")
+        self._response_cache = _LRUCache("voice-ai:response")
+
+        # Voice activity detection: WebRTC VAD on 20 ms frames when available, audio level otherwise
+        self.vad = webrtcvad.Vad(2) if webrtcvad is not None else None
+
         # Audio settings
-        self.chunk = 1024
         self.format = pyaudio.paInt16
         self.channels = 1
         self.rate = 16000
-        self.silence_threshold = 500  # Adjust based on your mic
-        self.silence_duration = 2  # Stop recording after 2 seconds of silence
+        self.chunk = int(self.rate * 0.02) if self.vad else 1024
+        self.silence_threshold = 500  # Adjust based on your mic (mean absolute level)
+        self.rms_threshold = 550  # Same sensitivity expressed as RMS, used with audioop
+        # Stop recording after this many seconds of silence (the VAD can cut much sooner)
+        self.silence_duration = 0.3 if self.vad else 2
+        self.preroll_duration = 0.2  # Audio kept from before speech onset so the first word isn't clipped
+        self.language = "en"  # Fixed transcription language (skips Whisper's language detection)
+
+        # Two preallocated recording buffers (30 s of samples each), grown only for longer utterances.
+        # Recording alternates between them so the previous utterance stays intact while it is transcribed.
+        self._rec_buf = np.empty(self.rate * 30, dtype=np.int16)
+        self._spare_rec_buf = np.empty(self.rate * 30, dtype=np.int16)
+
+        # Reused float32 buffer for Whisper input; one transcription at a time may use it
+        self._norm_buf = np.empty(self.rate * 30, dtype=np.float32)
+        self._transcribe_lock = threading.Lock()
+
+        # Reused scratch buffers for per-chunk speech detection
+        self._abs_buf = np.empty(self.chunk, dtype=np.int32)
+        self._level_buf = np.empty(self.chunk, dtype=np.float32)
+        # Optional RMS function over a float32 chunk (e.g. a SIMD kernel); used for the level check when set
+        self.compute_rms = None
+        if _level_exceeds is not None and not self.vad and audioop is None:
+            # Pay the JIT compile now rather than on the first chunk the user speaks
+            _level_exceeds(np.frombuffer(bytes(self.chunk * 2), dtype=np.int16), self.silence_threshold)
 
         # Voice response settings
         self.enable_voice_response = enable_voice_response
-
-        # Load Whisper
-        print("Loading Whisper...")
-        self.whisper_model = whisper.load_model("base")
+        # Listen for the next utterance while the current one is answered (use with headphones,
+        # otherwise the microphone picks up the AI's own voice)
+        self.full_duplex = full_duplex
+
+        # Whisper (plus its compile warmup) loads on a background thread while the rest starts up;
+        # wait_until_ready() blocks until it is done (see also the whisper_model property)
+        self.model_name = "base"
+        self._whisper_loader = threading.Thread(target=self._load_whisper, daemon=True)
+        self._whisper_loader.start()
         
         # Load TTS Engine
         if self.enable_voice_response:
             print("Loading Text-to-Speech engine...")
             try:
+                # Imported only when this engine speaks itself, so callers with their own TTS don't wait on it
+                from TTS_edge import EdgeTTSEngine
                 self.tts_engine = EdgeTTSEngine(voice=voice)
                 print(f"🔊 Voice response enabled with {voice}")
             except Exception as e:
@@ -58,126 +290,402 @@ class ContinuousVoiceChat:
         else:
             self.tts_engine = None
         
-        print("Ready! Start speaking...")
-
-        self.audio = pyaudio.PyAudio()
+        # Keep one input stream open for the whole session; it is only started/stopped per turn
+        if sd is not None:
+            # PortAudio callback mode: the audio thread pushes blocks into a bounded ring,
+            # the recorder just waits on an event instead of polling with blocking reads
+            self._captured = collections.deque(maxlen=int(self.rate * 30 / self.chunk))
+            self._capture_ready = threading.Event()
+            self.stream = sd.RawInputStream(
+                samplerate=self.rate,
+                blocksize=self.chunk,
+                dtype="int16",
+                channels=self.channels,
+                latency="low",
+                callback=self._on_audio
+            )
+        else:
+            self.audio = pyaudio.PyAudio()
+            self.stream = self.audio.open(
+                format=self.format,
+                channels=self.channels,
+                rate=self.rate,
+                input=True,
+                frames_per_buffer=self.chunk,
+                start=False
+            )
+        self._stream_lock = threading.Lock()
         self.is_listening = True
+        # Utterance recorded by wait_for_speech() after a barge-in, returned by the next recording call
+        self._barge_in_recording = None
+
+    @property
+    def whisper_model(self):
+        """Shared Whisper model, loaded on first access so startup isn't blocked by the model load"""
+        with _whisper_lock:
+            return _get_whisper(self.model_name)
+
+    def _load_whisper(self):
+        """Background thread: load the shared Whisper model so the first utterance doesn't pay for it"""
+        try:
+            self.whisper_model
+        except Exception as e:
+            print(f"⚠️ Whisper failed to load: {e}")
+
+    def wait_until_ready(self, timeout=None):
+        """Wait for the background Whisper load to finish; returns True once it has"""
+        if self._whisper_loader.is_alive():
+            print("⏳ Waiting for Whisper to finish loading...")
+            self._whisper_loader.join(timeout)
+        return not self._whisper_loader.is_alive()
 
     def detect_speech(self, data):
-        """Simple speech detection based on audio level"""
+        """Speech detection using WebRTC VAD, or a simple audio level check without it"""
+        if self.vad:
+            return self.vad.is_speech(data, self.rate)
+
+        if self.compute_rms is not None:
+            samples = np.frombuffer(data, dtype=np.int16)
+            if samples.size != self._level_buf.size:
+                self._level_buf = np.empty(samples.size, dtype=np.float32)
+            np.copyto(self._level_buf, samples, casting="unsafe")
+            return self.compute_rms(self._level_buf) > self.rms_threshold
+
+        if audioop is not None:
+            # One C call over the raw bytes, no NumPy objects created
+            return audioop.rms(data, 2) > self.rms_threshold
+
         audio_data = np.frombuffer(data, dtype=np.int16)
-        return np.abs(audio_data).mean() > self.silence_threshold
+        if _level_exceeds is not None:
+            return bool(_level_exceeds(audio_data, self.silence_threshold))
+
+        if audio_data.size != self._abs_buf.size:
+            return np.abs(audio_data, dtype=np.int32).sum() > self.silence_threshold * audio_data.size
+
+        # Integer sum-of-abs into the preallocated buffer: no temporaries, no float division
+        np.abs(audio_data, out=self._abs_buf, dtype=np.int32)
+        return self._abs_buf.sum() > self.silence_threshold * self.chunk
+
+    def _on_audio(self, indata, frames, time_info, status):
+        """sounddevice callback (runs on the PortAudio thread): queue the block for the recorder"""
+        self._captured.append(bytes(indata))
+        self._capture_ready.set()
+
+    def _start_capture(self):
+        """Start the persistent input stream"""
+        if sd is not None:
+            self._captured.clear()
+            self.stream.start()
+        else:
+            self.stream.start_stream()
+
+    def _stop_capture(self):
+        """Stop (but keep open) the persistent input stream"""
+        if sd is not None:
+            self.stream.stop()
+        else:
+            self.stream.stop_stream()
+
+    def _read_chunk(self):
+        """Return the next chunk of captured audio, or None once listening has stopped"""
+        if sd is None:
+            return self.stream.read(self.chunk, exception_on_overflow=False)
+
+        while self.is_listening:
+            try:
+                return self._captured.popleft()
+            except IndexError:
+                self._capture_ready.wait(0.5)
+                self._capture_ready.clear()
+        return None
 
     def record_until_silence(self):
         """Record audio until silence is detected"""
-        stream = self.audio.open(
-            format=self.format,
-            channels=self.channels,
-            rate=self.rate,
-            input=True,
-            frames_per_buffer=self.chunk
-        )
-
-        frames = []
+        with self._stream_lock:
+            # An utterance already recorded by wait_for_speech() (barge-in) is returned as is
+            if self._barge_in_recording is not None:
+                frames, self._barge_in_recording = self._barge_in_recording, None
+                return frames
+            # Write into the other buffer; the last recording may still be being transcribed
+            self._rec_buf, self._spare_rec_buf = self._spare_rec_buf, self._rec_buf
+            return self._record_locked()
+
+    def wait_for_speech(self, stop_event, min_speech=0.2, on_speech=None):
+        """Listen until the user starts talking or stop_event is set; returns True if speech was heard
+
+        Used to detect barge-in while the AI is speaking. Speech must last min_speech seconds to count.
+        Once it does, on_speech() is called, capture keeps running and the rest of the utterance is
+        recorded right here, with no gap, so the next record_until_silence() call returns it immediately.
+        """
+        needed = max(1, int(min_speech * self.rate / self.chunk))
+        preroll = collections.deque(maxlen=max(1, int(self.preroll_duration * self.rate / self.chunk)))
+        heard = []
+        with self._stream_lock:
+            self._start_capture()
+            try:
+                while self.is_listening and not stop_event.is_set() and len(heard) < needed:
+                    data = self._read_chunk()
+                    if data is None:
+                        break
+                    if self.detect_speech(data):
+                        heard.append(data)
+                    else:
+                        preroll.extend(heard)
+                        preroll.append(data)
+                        heard.clear()
+            except BaseException:
+                self._stop_capture()
+                raise
+
+            if len(heard) < needed:
+                self._stop_capture()
+                return False
+
+            if on_speech is not None:
+                on_speech()
+            # Hand off to the recorder with the stream still running
+            self._rec_buf, self._spare_rec_buf = self._spare_rec_buf, self._rec_buf
+            self._barge_in_recording = self._record_locked(onset=[*preroll, *heard])
+        return True
+
+    def _record_locked(self, onset=None):
+        """Record into self._rec_buf; the caller must hold the stream lock
+
+        With onset (chunks of an utterance already in progress), capture is assumed to be running and
+        recording continues from them.
+        """
+        if onset is None:
+            self._start_capture()
+
+        length = 0
+        preroll = collections.deque(maxlen=max(1, int(self.preroll_duration * self.rate / self.chunk)))
         silent_chunks = 0
         recording = False
 
-        print("Listening... (speak now)")
+        if onset:
+            print("🎤 Recording...")
+            recording = True
+            for earlier in onset:
+                length = self._append_samples(earlier, length)
+        else:
+            print("Listening... (speak now)")
 
-        while self.is_listening:
-            data = stream.read(self.chunk)
-
-            if self.detect_speech(data):
-                if not recording:
-                    print("🎤 Recording...")
-                    recording = True
-                frames.append(data)
-                silent_chunks = 0
-            else:
-                if recording:
+        try:
+            while self.is_listening:
+                data = self._read_chunk()
+                if data is None:
+                    break
+
+                if self.detect_speech(data):
+                    if not recording:
+                        print("🎤 Recording...")
+                        recording = True
+                        for earlier in preroll:
+                            length = self._append_samples(earlier, length)
+                    length = self._append_samples(data, length)
+                    silent_chunks = 0
+                elif recording:
                     silent_chunks += 1
-                    frames.append(data)
+                    length = self._append_samples(data, length)
 
                     # Stop if silent for too long
                     if silent_chunks > (self.silence_duration * self.rate / self.chunk):
                         print("✅ Speech ended")
                         break
+                else:
+                    preroll.append(data)
+        finally:
+            self._stop_capture()
 
-        stream.stop_stream()
-        stream.close()
+        return self._rec_buf[:length] if length else None
 
-        return frames if frames else None
+    def _append_samples(self, data, length):
+        """Copy one chunk of int16 audio into the recording buffer, returning the new length"""
+        samples = np.frombuffer(data, dtype=np.int16)
+        end = length + samples.size
+        if end > self._rec_buf.size:
+            self._rec_buf = np.resize(self._rec_buf, max(end, self._rec_buf.size * 2))
+        self._rec_buf[length:end] = samples
+        return end
 
     def transcribe_direct(self, frames):
-        """Transcribe audio directly from memory without file operations"""
-        if not frames:
+        """Transcribe audio directly from memory without file operations
+
+        Accepts the int16 sample array returned by record_until_silence or a list of raw chunks.
+        """
+        if frames is None or len(frames) == 0:
             return None
 
         try:
             print("🔄 Transcribing directly from memory...")
             
             # Convert audio frames to numpy array
-            audio_data = np.frombuffer(b''.join(frames), dtype=np.int16)
+            if isinstance(frames, np.ndarray):
+                audio_data = frames
+            else:
+                audio_data = np.frombuffer(b''.join(frames), dtype=np.int16)
             
-            # Convert to float32 and normalize (Whisper expects float32 between -1 and 1)
-            audio_float = audio_data.astype(np.float32) / 32768.0
+            audio_key = hashlib.sha1(np.ascontiguousarray(audio_data)).hexdigest()
+            if self.enable_cache:
+                cached = self._transcript_cache.get(audio_key)
+                if cached:
+                    print(f"📝 Transcribed (cached): '{cached}'")
+                    return cached
             
-            # Transcribe directly from memory
-            result = self.whisper_model.transcribe(audio_float)
-            text = result["text"].strip()
+            with self._transcribe_lock:
+                # Convert to float32 and normalize (Whisper expects float32 between -1 and 1)
+                # in a single cast+multiply pass into the reused buffer
+                n = audio_data.size
+                if n > self._norm_buf.size:
+                    self._norm_buf = np.empty(n, dtype=np.float32)
+                audio_float = self._norm_buf[:n]
+                np.multiply(audio_data, np.float32(1.0 / 32768.0), out=audio_float, casting="unsafe")
+                
+                # Transcribe directly from memory
+                # Greedy decoding with a fixed language: no beam search and no language-detection pass
+                if WhisperModel is not None:
+                    segments, _ = self.whisper_model.transcribe(audio_float, beam_size=1, best_of=1,
+                                                                temperature=0.0, vad_filter=False,
+                                                                language=self.language,
+                                                                condition_on_previous_text=False)
+                    text = " ".join(segment.text.strip() for segment in segments).strip()
+                else:
+                    result = self.whisper_model.transcribe(audio_float, language=self.language,
+                                                           task="transcribe", temperature=0.0,
+                                                           condition_on_previous_text=False,
+                                                           no_speech_threshold=0.6, fp16=False)
+                    text = result["text"].strip()
             
             print(f"📝 Transcribed: '{text}'")
+            if text and self.enable_cache:
+                self._transcript_cache.put(audio_key, text)
             return text if text else None
 
         except Exception as e:
             print(f"⚠️ Transcription error: {e}")
             return None
 
-    def ask_deepseek(self, text):
-        """Send text to DeepSeek and get response"""
+    def open_chat_stream(self, messages, model=None):
+        """Open a streaming (SSE) chat completion; returns the response or None on API errors"""
+        payload = {"model": model or self.llm_model, **self._chat_payload_base, "messages": messages}
+        response = self.http.post(
+            OPENROUTER_URL,
+            data=_json_dumps(payload),
+            stream=True,
+            timeout=30  # Add timeout to prevent hanging
+        )
+
+        if response.status_code == 200:
+            return response
+
+        if response.status_code == 401:
+            print("❌ API Error: Invalid API key")
+        elif response.status_code == 429:
+            print("⏳ API Error: Rate limit exceeded. Try again in a moment.")
+        else:
+            print(f"❌ API Error: {response.status_code} - {response.text}")
+        response.close()
+        return None
+
+    def iter_chat_deltas(self, response, cancel=None):
+        """Yield response text fragments from an OpenRouter SSE stream as they arrive
+
+        Stops early once the optional cancel event is set (checked on every SSE line).
+        """
+        response.encoding = "utf-8"
+        for line in response.iter_lines(decode_unicode=True):
+            if cancel is not None and cancel.is_set():
+                break
+
+            # Skip keep-alive comments (": OPENROUTER PROCESSING") and blank separators
+            if not line or not line.startswith("data: "):
+                continue
+
+            data = line[len("data: "):]
+            if data == "[DONE]":
+                break
+
+            try:
+                choices = _json_loads(data).get("choices") or []
+            except ValueError:
+                continue
+            if choices:
+                delta = (choices[0].get("delta") or {}).get("content")
+                if delta:
+                    yield delta
+
+    def _speech_worker(self, sentences):
+        """Play queued sentence syntheses in order until a None sentinel arrives"""
+        while True:
+            speech = sentences.get()
+            if speech is None:
+                break
+            if not self.tts_engine.play(speech):
+                print("⚠️ Voice response failed")
+
+    def ask_deepseek(self, text, use_cache=True):
+        """Send text to DeepSeek and stream the response, speaking each sentence as it completes
+
+        Pass use_cache=False for prompts whose answer must not be reused (e.g. time-dependent ones).
+        """
         print(f"You: {text}")
-        print("🤖 DeepSeek thinking...")
 
-        try:
-            response = requests.post(
-                "https://openrouter.ai/api/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "deepseek/deepseek-r1:free",
-                    "messages": [{"role": "user", "content": text}],
-                    "temperature": 0.7,
-                    "max_tokens": 800
-                },
-                timeout=30  # Add timeout to prevent hanging
-            )
+        speak = bool(self.enable_voice_response and self.tts_engine)
+        prompt_key = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        use_cache = use_cache and self.enable_cache
 
-            if response.status_code == 200:
-                ai_response = response.json()["choices"][0]["message"]["content"]
-                print(f"DeepSeek: {ai_response}\n")
-                
-                # Add voice response if enabled
-                if self.enable_voice_response and self.tts_engine:
-                    print("🔊 Converting response to speech...")
+        if use_cache:
+            cached = self._response_cache.get(prompt_key)
+            if cached:
+                print(f"DeepSeek (cached): {cached}\n")
+                if speak:
                     try:
-                        self.tts_engine.speak(ai_response)
-                        print("✅ AI response spoken")
+                        self.tts_engine.speak(cached)
                     except Exception as e:
                         print(f"⚠️ Voice response failed: {e}")
-                
-                return ai_response
-            elif response.status_code == 401:
-                print("❌ API Error: Invalid API key")
-                return None
-            elif response.status_code == 429:
-                print("⏳ API Error: Rate limit exceeded. Try again in a moment.")
-                return None
-            else:
-                print(f"❌ API Error: {response.status_code} - {response.text}")
+                return cached
+
+        print("🤖 DeepSeek thinking...")
+        sentences = queue.Queue()
+        speech_thread = None
+
+        try:
+            response = self.open_chat_stream([{"role": "user", "content": text}])
+            if response is None:
                 return None
 
+            if speak:
+                from TTS_edge import SENTENCE_BOUNDARY
+                print("🔊 Converting response to speech as it streams...")
+                speech_thread = threading.Thread(target=self._speech_worker, args=(sentences,), daemon=True)
+                speech_thread.start()
+
+            parts = []
+            pending = ""
+            print("DeepSeek: ", end="", flush=True)
+            with response:
+                for delta in self.iter_chat_deltas(response):
+                    print(delta, end="", flush=True)
+                    parts.append(delta)
+
+                    if speak:
+                        # Hand every finished sentence to TTS while the rest is still generating
+                        pending += delta
+                        *finished, pending = SENTENCE_BOUNDARY.split(pending)
+                        for sentence in finished:
+                            if sentence.strip():
+                                # Synthesis starts now; the worker only keeps playback in order
+                                sentences.put(self.tts_engine.synthesize(sentence.strip()))
+            print("\n")
+
+            if speak and pending.strip():
+                sentences.put(self.tts_engine.synthesize(pending.strip()))
+
+            ai_response = "".join(parts).strip()
+            if ai_response and use_cache:
+                self._response_cache.put(prompt_key, ai_response)
+            return ai_response if ai_response else None
+
         except requests.exceptions.Timeout:
             print("⏰ Request timed out. Try again.")
             return None
@@ -187,6 +695,11 @@ class ContinuousVoiceChat:
         except Exception as e:
             print(f"❌ Unexpected error: {e}")
             return None
+        finally:
+            if speech_thread:
+                sentences.put(None)
+                speech_thread.join()
+                print("✅ AI response spoken")
 
     def run(self):
         """Main continuous loop"""
@@ -201,14 +714,24 @@ class ContinuousVoiceChat:
         print("💡 Tip: Speak clearly and pause when done")
         print("⏹️  Press Ctrl+C to exit\n")
 
+        self.wait_until_ready()
+        print("Ready! Start speaking...")
+
+        pool = concurrent.futures.ThreadPoolExecutor(max_workers=2)
         try:
+            # Record speech
+            frames = self.record_until_silence()
+
             while True:
-                # Record speech
-                frames = self.record_until_silence()
+                next_recording = None
 
-                if frames:
+                if frames is not None:
                     # Transcribe directly from memory
-                    text = self.transcribe_direct(frames)
+                    transcription = pool.submit(self.transcribe_direct, frames)
+                    if self.full_duplex:
+                        # Start capturing the next utterance while this one is transcribed and answered
+                        next_recording = pool.submit(self.record_until_silence)
+                    text = transcription.result()
 
                     if text and len(text.strip()) > 2:
                         # Get AI response
@@ -218,16 +741,25 @@ class ContinuousVoiceChat:
                 else:
                     print("❌ No speech detected\n")
 
-                # Brief pause before listening again
-                time.sleep(0.5)
-                print("Listening... (speak now)")
+                if next_recording:
+                    frames = next_recording.result()
+                else:
+                    # Brief pause before listening again
+                    time.sleep(0.5)
+                    frames = self.record_until_silence()
 
         except KeyboardInterrupt:
             print("\n👋 Goodbye!")
             self.is_listening = False
+        finally:
+            pool.shutdown(wait=False)
 
     def __del__(self):
         """Cleanup"""
+        if hasattr(self, 'stream'):
+            self.stream.close()
+        if hasattr(self, 'http') and self._owns_http:
+            self.http.close()
         if hasattr(self, 'audio'):
             self.audio.terminate()
 
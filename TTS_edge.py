@@ -5,6 +5,10 @@ Converts AI responses to natural speech
 """
 
 import asyncio
+import collections
+import hashlib
+import os
+import re
 import edge_tts
 import pygame
 import io
@@ -12,21 +16,48 @@ import threading
 import time
 from typing import Optional
 
+# Sentence boundaries used to split long text into separately synthesized pieces
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n+")
+
 
 class EdgeTTSEngine:
-    def __init__(self, voice="en-US-AriaNeural", rate="+15%"):
+    def __init__(self, voice="en-US-AriaNeural", rate="+15%", cache_dir="tts_cache", cache_size=32):
         """
         Initialize TTS engine with voice settings
         
         Args:
             voice: Voice to use (default: en-US-AriaNeural - female voice)
             rate: Speech rate (e.g., "+20%" for faster, "-20%" for slower)
+            cache_dir: Folder where fixed phrases are kept pre-rendered (None to disable)
+            cache_size: Number of rendered phrases kept in memory
         """
         self.voice = voice
         self.rate = rate
         
-        # Initialize pygame mixer for audio playback
-        pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
+        # LRU of rendered phrases, keyed by a hash of voice, rate and text
+        self.cache_dir = cache_dir
+        self.cache_size = cache_size
+        self._cache = collections.OrderedDict()
+        self._cache_lock = threading.Lock()
+        
+        # Initialize pygame mixer for audio playback (shared by all engines, only once).
+        # The output device stays open for the whole session; 24 kHz mono matches edge-tts output,
+        # so playback needs no resampling or channel upmix
+        if not pygame.mixer.get_init():
+            pygame.mixer.init(frequency=24000, size=-16, channels=1, buffer=512)
+        
+        # Set whenever nothing is playing, so callers can wait for playback to drain
+        self.playback_finished = threading.Event()
+        self.playback_finished.set()
+        # One playback at a time: callers on different threads take turns instead of fighting over the mixer
+        self._playback_lock = threading.Lock()
+        # Set by stop_speech() so a multi-sentence speak() call also skips its remaining sentences
+        self._stop_requested = threading.Event()
+        
+        # One long-lived event loop for all synthesis calls instead of a new loop per utterance
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._loop_thread.start()
         
         print(f"🔊 TTS Engine initialized with voice: {voice}")
     
@@ -34,13 +65,13 @@ class EdgeTTSEngine:
         """Generate speech audio data asynchronously"""
         try:
             communicate = edge_tts.Communicate(text, self.voice, rate=self.rate)
-            audio_data = b""
+            audio_chunks = []
             
             async for chunk in communicate.stream():
                 if chunk["type"] == "audio":
-                    audio_data += chunk["data"]
+                    audio_chunks.append(chunk["data"])
             
-            return audio_data
+            return b"".join(audio_chunks)
         except Exception as e:
             print(f"❌ TTS Generation Error: {e}")
             return b""
@@ -48,46 +79,165 @@ class EdgeTTSEngine:
     def generate_speech(self, text: str) -> Optional[bytes]:
         """Generate speech audio data (synchronous wrapper)"""
         try:
-            # Run the async function in a new event loop
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            audio_data = loop.run_until_complete(self._generate_speech_async(text))
-            loop.close()
+            # Run the async function on the engine's background event loop
+            audio_data = self._submit_speech(text).result()
             return audio_data if audio_data else None
         except Exception as e:
             print(f"❌ TTS Error: {e}")
             return None
     
-    def speak(self, text: str) -> bool:
-        """Convert text to speech and play it"""
+    def get_speech(self, text: str) -> Optional[bytes]:
+        """Return speech audio for text from the cache (memory, then disk), synthesizing it on a miss"""
+        key = hashlib.sha1(f"{self.voice}|{self.rate}|{text}".encode("utf-8")).hexdigest()
+        
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        
+        path = os.path.join(self.cache_dir, f"{key}.mp3") if self.cache_dir else None
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                audio_data = f.read()
+        else:
+            audio_data = self.generate_speech(text)
+            if not audio_data:
+                return None
+            if path:
+                try:
+                    os.makedirs(self.cache_dir, exist_ok=True)
+                    with open(path, "wb") as f:
+                        f.write(audio_data)
+                except OSError as e:
+                    print(f"⚠️ Could not write TTS cache: {e}")
+        
+        with self._cache_lock:
+            self._cache[key] = audio_data
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return audio_data
+    
+    def prefetch(self, texts):
+        """Render fixed phrases into the cache on a background thread so their first playback is instant"""
+        def _prefetch_thread():
+            for text in texts:
+                self.get_speech(text)
+        
+        thread = threading.Thread(target=_prefetch_thread, daemon=True)
+        thread.start()
+        return thread
+    
+    def speak(self, text: str, cache: bool = False, stop=None) -> bool:
+        """Convert text to speech and play it
+        
+        Set cache=True for fixed phrases so they are rendered once and replayed instantly afterwards.
+        Pass a stop event to cut speech short when it is set (also if it already is); without one,
+        stop_speech() does so for this call.
+        """
         if not text or not text.strip():
             return False
         
         print(f"🔊 Speaking: '{text[:50]}{'...' if len(text) > 50 else ''}'")
+        if stop is None:
+            self._stop_requested.clear()
+            stop = self._stop_requested
+        
+        if cache:
+            try:
+                audio_data = self.get_speech(text)
+                if not audio_data:
+                    print("❌ Failed to generate speech")
+                    return False
+                if not self._play(audio_data, stop):
+                    return False
+                print("✅ Speech completed")
+                return True
+            except Exception as e:
+                print(f"❌ Speech playback error: {e}")
+                return False
+        
+        sentences = [sentence.strip() for sentence in SENTENCE_BOUNDARY.split(text) if sentence.strip()]
+        spoken = False
         
         try:
-            # Generate speech
-            audio_data = self.generate_speech(text)
+            # Synthesize the next sentence in the background while the current one plays
+            pending = self._submit_speech(sentences[0])
+            for index in range(len(sentences)):
+                if stop.is_set():
+                    pending.cancel()
+                    break
+                audio_data = pending.result()
+                if index + 1 < len(sentences):
+                    pending = self._submit_speech(sentences[index + 1])
+                
+                if not audio_data:
+                    print("❌ Failed to generate speech")
+                    continue
+                
+                # stop_speech() may have been called while this sentence was still being synthesized
+                if not self._play(audio_data, stop):
+                    break
+                spoken = True
+            
+            if spoken:
+                print("✅ Speech completed")
+            return spoken
+            
+        except Exception as e:
+            print(f"❌ Speech playback error: {e}")
+            return False
+    
+    def synthesize(self, text: str):
+        """Start synthesizing text in the background and return a future for play()
+
+        Lets callers queue several pieces so each one is synthesized while the previous one plays.
+        """
+        return self._submit_speech(text)
+    
+    def play(self, audio, stop=None) -> bool:
+        """Play a future from synthesize() (waiting for it if needed) or raw MP3 bytes; returns True if played
+
+        If the optional stop event is set before or during playback, nothing more is played.
+        """
+        try:
+            audio_data = audio.result() if hasattr(audio, "result") else audio
             if not audio_data:
                 print("❌ Failed to generate speech")
                 return False
-            
-            # Play the audio using pygame
-            audio_buffer = io.BytesIO(audio_data)
-            pygame.mixer.music.load(audio_buffer)
-            pygame.mixer.music.play()
-            
-            # Wait for playback to complete
-            while pygame.mixer.music.get_busy():
-                time.sleep(0.1)
-            
-            print("✅ Speech completed")
-            return True
-            
+            return self._play(audio_data, stop)
         except Exception as e:
             print(f"❌ Speech playback error: {e}")
             return False
     
+    def _submit_speech(self, text: str):
+        """Schedule synthesis of text on the background loop and return its future"""
+        return asyncio.run_coroutine_threadsafe(self._generate_speech_async(text), self._loop)
+    
+    def _play(self, audio_data: bytes, stop=None) -> bool:
+        """Play MP3 audio data using pygame and wait for playback to complete
+
+        Returns False without playing if stop is already set; playback is cut short if it gets set.
+        """
+        with self._playback_lock:
+            if stop is not None and stop.is_set():
+                return False
+            self.playback_finished.clear()
+            try:
+                audio_buffer = io.BytesIO(audio_data)
+                pygame.mixer.music.load(audio_buffer)
+                pygame.mixer.music.play()
+                
+                # Poll finely so the next sentence starts right after this one ends
+                while pygame.mixer.music.get_busy():
+                    if stop is not None and stop.is_set():
+                        pygame.mixer.music.stop()
+                        return False
+                    time.sleep(0.02)
+                return True
+            finally:
+                self.playback_finished.set()
+    
     def speak_async(self, text: str):
         """Speak text in background thread (non-blocking)"""
         def _speak_thread():
@@ -100,11 +250,26 @@ class EdgeTTSEngine:
     def stop_speech(self):
         """Stop current speech playback"""
         try:
+            self._stop_requested.set()
             pygame.mixer.music.stop()
+            self.playback_finished.set()
             print("🔇 Speech stopped")
         except Exception as e:
             print(f"⚠️ Error stopping speech: {e}")
     
+    def close(self):
+        """Stop playback, shut down the synthesis event loop and release the audio device"""
+        if self._loop.is_closed():
+            return
+        if pygame.mixer.get_init():
+            pygame.mixer.music.stop()
+            pygame.mixer.quit()
+        self.playback_finished.set()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join(timeout=2)
+        if not self._loop.is_running():
+            self._loop.close()
+    
     def set_voice(self, voice: str):
         """Change the TTS voice"""
         self.voice = voice
@@ -5,6 +5,7 @@ Speech → Text → AI Response → Speech
 """
 
 import os
+import re
 import sys
 import time
 from STT_whisper import ContinuousVoiceChat
@@ -12,6 +13,9 @@ from TTS_edge import EdgeTTSEngine
 
 
 class FullConversationalAI:
+    # All spoken voice-control commands, matched in a single case-insensitive scan
+    VOICE_COMMANDS = re.compile(r"(unmute voice|mute voice|disable voice|enable voice)", re.IGNORECASE)
+    
     def __init__(self, api_key=None, voice="en-US-AriaNeural", speech_rate="+0%"):
         """
         Initialize the complete conversational AI system
@@ -27,18 +31,33 @@ class FullConversationalAI:
         print("📱 Loading Speech-to-Text engine...")
         self.stt_engine = ContinuousVoiceChat(api_key)
         
-        # Initialize Text-to-Speech engine
-        print("🔊 Loading Text-to-Speech engine...")
-        self.tts_engine = EdgeTTSEngine(voice=voice, rate=speech_rate)
+        # Text-to-Speech engine is created on first use (see the tts_engine property)
+        self.voice = voice
+        self.speech_rate = speech_rate
+        self._tts_engine = None
         
         # System settings
         self.enable_voice_responses = True
         self.conversation_history = []
+        self._command_handlers = {
+            "mute voice": self._mute_voice,
+            "disable voice": self._mute_voice,
+            "enable voice": self._unmute_voice,
+            "unmute voice": self._unmute_voice,
+        }
         
         print("✅ Conversational AI System Ready!")
         print(f"🎭 Using voice: {voice}")
         print(f"⚡ Speech rate: {speech_rate}")
     
+    @property
+    def tts_engine(self):
+        """Text-to-Speech engine, created on first use"""
+        if self._tts_engine is None:
+            print("🔊 Loading Text-to-Speech engine...")
+            self._tts_engine = EdgeTTSEngine(voice=self.voice, rate=self.speech_rate)
+        return self._tts_engine
+    
     def process_conversation_turn(self):
         """Handle one complete conversation turn: Listen → Transcribe → AI Response → Speak"""
         try:
@@ -46,7 +65,7 @@ class FullConversationalAI:
             print("\n🎯 === New Conversation Turn ===")
             frames = self.stt_engine.record_until_silence()
             
-            if not frames:
+            if frames is None:
                 print("❌ No speech detected")
                 return False
             
@@ -97,6 +116,9 @@ class FullConversationalAI:
         print("   - Say 'enable voice' to re-enable speech")
         print("⏹️  Press Ctrl+C to exit\n")
         
+        # Pay the Whisper load and warmup before the user speaks, not on the first utterance
+        self.stt_engine.wait_until_ready()
+        
         try:
             while True:
                 # Handle one conversation turn
@@ -105,14 +127,9 @@ class FullConversationalAI:
                 if success:
                     # Check for voice control commands
                     last_turn = self.conversation_history[-1]
-                    user_text = last_turn["user"].lower()
-                    
-                    if "mute voice" in user_text or "disable voice" in user_text:
-                        self.enable_voice_responses = False
-                        print("🔇 Voice responses disabled")
-                    elif "enable voice" in user_text or "unmute voice" in user_text:
-                        self.enable_voice_responses = True
-                        print("🔊 Voice responses enabled")
+                    command = self.VOICE_COMMANDS.search(last_turn["user"])
+                    if command:
+                        self._command_handlers[command.group(1).lower()]()
                 
                 # Brief pause before next turn
                 time.sleep(0.5)
@@ -122,6 +139,16 @@ class FullConversationalAI:
             print("\n👋 Conversation ended!")
             self.show_conversation_summary()
     
+    def _mute_voice(self):
+        """Voice command: stop speaking responses"""
+        self.enable_voice_responses = False
+        print("🔇 Voice responses disabled")
+    
+    def _unmute_voice(self):
+        """Voice command: speak responses again"""
+        self.enable_voice_responses = True
+        print("🔊 Voice responses enabled")
+    
     def show_conversation_summary(self):
         """Show a summary of the conversation"""
         if not self.conversation_history:
@@ -142,12 +169,12 @@ class FullConversationalAI:
         """Change the TTS voice"""
         self.tts_engine.set_voice(voice_name)
         # Test the new voice
-        self.tts_engine.speak(f"Voice changed to {voice_name}")
+        self.tts_engine.speak(f"Voice changed to {voice_name}", cache=True)
     
     def change_speech_rate(self, rate):
         """Change speech rate"""
         self.tts_engine.set_speed(rate)
-        self.tts_engine.speak(f"Speech rate changed to {rate}")
+        self.tts_engine.speak(f"Speech rate changed to {rate}", cache=True)
     
     def list_voices(self):
         """List available voices"""
@@ -156,7 +183,8 @@ class FullConversationalAI:
     def test_voice_output(self, text="Hello! This is a test of the voice output system."):
         """Test the voice output"""
         print("🧪 Testing voice output...")
-        success = self.tts_engine.speak(text)
+        # Test phrases are fixed, so replay them from the TTS cache after the first run
+        success = self.tts_engine.speak(text, cache=True)
         return success
 
 
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Semantic response cache for the voice conversational AI
+Reuses an earlier AI answer when a new question means the same thing
+"""
+
+import collections
+import importlib.util
+import itertools
+import logging
+import threading
+import time
+
+import numpy as np
+
+# sentence-transformers (and torch behind it) is only imported on the background loader thread
+HAVE_SENTENCE_TRANSFORMERS = importlib.util.find_spec("sentence_transformers") is not None
+
+# Child of the voice AI's console logger, so messages from the loader thread are queued in order
+logger = logging.getLogger("voice_ai.semantic_cache")
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+
+class SemanticResponseCache:
+    def __init__(self, model_name="sentence-transformers/all-MiniLM-L6-v2", threshold=0.92,
+                 max_entries=256, ttl=3600):
+        """
+        Initialize the cache and start loading the sentence embedding model in the background
+
+        Until the model has loaded, lookups miss and answers are not stored.
+
+        Args:
+            model_name: sentence-transformers model used to embed questions
+            threshold: Minimum cosine similarity for a cached answer to be reused
+            max_entries: Number of answers kept (least recently used are evicted)
+            ttl: Seconds an answer stays valid
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self.model = None
+        if HAVE_SENTENCE_TRANSFORMERS:
+            threading.Thread(target=self._load_model, args=(model_name,), daemon=True).start()
+
+        # entry id -> (normalized embedding, response, context key, created at)
+        self._entries = collections.OrderedDict()
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._index = None
+        self._index_ids = []
+        self._last_embedding = (None, None)
+
+    def _load_model(self, model_name):
+        """Background thread: import sentence-transformers and load the embedding model"""
+        try:
+            from sentence_transformers import SentenceTransformer
+            self.model = SentenceTransformer(model_name)
+            logger.info("🧠 Semantic response cache ready")
+        except Exception as e:
+            logger.warning(f"⚠️ Semantic cache disabled, embedding model failed to load: {e}")
+
+    @property
+    def enabled(self):
+        """Whether the embedding model has loaded (sentence-transformers installed)"""
+        return self.model is not None
+
+    def _embed(self, text):
+        """Normalized float32 embedding of text, reusing the last one for repeated text"""
+        last_text, last_embedding = self._last_embedding
+        if text == last_text:
+            return last_embedding
+        embedding = self.model.encode([text], normalize_embeddings=True)[0].astype(np.float32)
+        self._last_embedding = (text, embedding)
+        return embedding
+
+    def _expire(self, now):
+        """Drop entries older than the TTL; the caller must hold the lock"""
+        expired = [entry_id for entry_id, entry in self._entries.items() if now - entry[3] > self.ttl]
+        for entry_id in expired:
+            del self._entries[entry_id]
+        if expired:
+            self._index = None
+
+    def _candidates(self, embedding):
+        """Entry ids ordered by similarity to embedding, with scores; the caller must hold the lock"""
+        if faiss is not None:
+            if self._index is None:
+                # Rebuild the inner-product index after evictions (cheap at this size)
+                self._index_ids = list(self._entries)
+                self._index = faiss.IndexFlatIP(embedding.size)
+                if self._index_ids:
+                    self._index.add(np.stack([self._entries[i][0] for i in self._index_ids]))
+            if not self._index_ids:
+                return []
+            scores, positions = self._index.search(embedding[None, :], min(8, len(self._index_ids)))
+            return [(self._index_ids[p], s) for p, s in zip(positions[0], scores[0]) if p >= 0]
+
+        ids = list(self._entries)
+        if not ids:
+            return []
+        scores = np.stack([self._entries[i][0] for i in ids]) @ embedding
+        order = np.argsort(scores)[::-1][:8]
+        return [(ids[p], scores[p]) for p in order]
+
+    def lookup(self, text, context_key=""):
+        """Return a cached response for a question similar to text asked in the same context, or None"""
+        if not self.enabled:
+            return None
+
+        embedding = self._embed(text)
+        with self._lock:
+            self._expire(time.time())
+            for entry_id, score in self._candidates(embedding):
+                if score < self.threshold:
+                    break
+                entry = self._entries.get(entry_id)
+                if entry is not None and entry[2] == context_key:
+                    self._entries.move_to_end(entry_id)
+                    return entry[1]
+        return None
+
+    def store(self, text, response, context_key=""):
+        """Remember response as the answer to text in the given context"""
+        if not self.enabled:
+            return
+
+        embedding = self._embed(text)
+        with self._lock:
+            entry_id = next(self._ids)
+            self._entries[entry_id] = (embedding, response, context_key, time.time())
+            if len(self._entries) > self.max_entries:
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                self._index = None
+            elif self._index is not None:
+                self._index.add(embedding[None, :])
+                self._index_ids.append(entry_id)
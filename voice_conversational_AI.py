@@ -4,15 +4,138 @@ Complete Real-time Voice Conversational AI System
 Speech → Text → AI Response → Voice Speech
 """
 
+import asyncio
+import collections
+import concurrent.futures
+import hashlib
+import importlib
+import itertools
+import logging
+import logging.handlers
 import os
+import queue
+import re
+import sqlite3
 import sys
+import threading
 import time
-from STT_whisper import ContinuousVoiceChat
-from TTS_edge import EdgeTTSEngine
+from dataclasses import dataclass
+
+try:
+    import colorama
+except ImportError:
+    colorama = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import numpy_rms
+except ImportError:
+    numpy_rms = None
+
+# Enable ANSI/UTF-8 console handling on Windows once, up front
+if colorama is not None and os.name == "nt":
+    colorama.just_fix_windows_console()
+
+# Console logger: records are queued by the caller and written to stdout by a listener thread
+logger = logging.getLogger("voice_ai")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+_log_queue = queue.Queue(-1)
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_console_handler = logging.StreamHandler(sys.stdout)
+_console_handler.setFormatter(logging.Formatter("%(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _console_handler)
+_log_listener_lock = threading.Lock()
+
+
+def _start_logging():
+    """Start the console log listener thread (no-op if it is already running)"""
+    with _log_listener_lock:
+        if _log_listener._thread is None:
+            _log_listener.start()
+
+
+def _stop_logging():
+    """Flush queued log records and stop the listener thread"""
+    with _log_listener_lock:
+        if _log_listener._thread is not None:
+            _log_listener.stop()
+
+
+# Byte-identical on every request so the provider's prompt-prefix cache keeps hitting; anything that
+# changes between turns (summary, history) goes in the messages after it, never in here
+STATIC_SYSTEM_PROMPT = sys.intern(
+    "You are a friendly voice assistant. Your replies are spoken aloud, so answer conversationally "
+    "in a few short sentences, without markdown, lists, code or emoji."
+)
+_SYSTEM_MESSAGE = {"role": "system", "content": STATIC_SYSTEM_PROMPT}
+
+# A buffered chunk of the streamed reply is sent to TTS once it ends a sentence or grows this long
+FLUSH_POINT = re.compile(r"[.?!]\s*$")
+MAX_PENDING_TOKENS = 80
+
+# Words that make a question depend on the earlier conversation (its cached answer is then context-bound)
+REFERS_BACK = re.compile(r"\b(it|its|that|this|these|those|they|them|their|he|him|his|she|her|there|"
+                         r"again|more|else|also|another|previous|earlier|before|above)\b", re.IGNORECASE)
+
+INSERT_TURN = "INSERT INTO turns(ts, user, ai) VALUES(?, ?, ?)"
+
+# Spoken voice-control commands, matched in a single pass over the lowercased transcript
+VOICE_COMMAND_PHRASES = ("unmute voice", "mute voice", "disable voice", "enable voice")
+# ASCII-only lowercasing table: commands are ASCII, so the transcript is lowered once as bytes
+_LOWER = bytes.maketrans(bytes(range(65, 91)), bytes(range(97, 123)))
+if ahocorasick is not None:
+    _command_automaton = ahocorasick.Automaton()
+    for _phrase in VOICE_COMMAND_PHRASES:
+        _command_automaton.add_word(_phrase, _phrase)
+    _command_automaton.make_automaton()
+else:
+    _command_automaton = None
+    # Longest first, so "unmute voice" wins over the "mute voice" it contains
+    _command_bytes = sorted((phrase.encode("ascii") for phrase in VOICE_COMMAND_PHRASES), key=len, reverse=True)
+
+
+def lower_ascii(text):
+    """ASCII bytes of text, lowercased in one translate pass (non-ASCII characters are dropped)"""
+    return text.encode("ascii", "ignore").translate(_LOWER)
+
+
+def find_voice_command(text):
+    """Return the voice-control phrase found in lower_ascii() bytes (the longest at its position), or None"""
+    if _command_automaton is not None:
+        for _, phrase in _command_automaton.iter_long(text.decode("ascii")):
+            return phrase
+        return None
+    for phrase in _command_bytes:
+        if phrase in text:
+            return phrase.decode("ascii")
+    return None
+
+
+@dataclass(slots=True, frozen=True)
+class Turn:
+    """One exchange of the conversation"""
+    user: str
+    ai: str
+    timestamp: float
+    interrupted: bool = False
 
 
 class VoiceConversationalAI:
-    def __init__(self, api_key=None, voice="en-US-AriaNeural", speech_rate="+0%"):
+    # Fixed phrases, pre-rendered at startup and replayed from the TTS cache
+    GREETING = "Hello! I'm your voice conversational AI assistant. I can hear you and speak back to you. What would you like to talk about?"
+    FAREWELL = "Goodbye! It was nice talking with you."
+    VOICE_ENABLED_MESSAGE = "Voice responses are now enabled again."
+    TEST_MESSAGE = "Hello! This is a test of the complete voice conversational AI system. I can hear you and speak back to you!"
+    
+    def __init__(self, api_key=None, voice="en-US-AriaNeural", speech_rate="+0%",
+                 llm_models=("deepseek/deepseek-r1:free",),
+                 history_cap=500, history_db="history.db", summary_model="meta-llama/llama-3.1-8b-instruct:free",
+                 barge_in=False):
         """
         Initialize the complete voice conversational AI system
         
@@ -20,150 +143,582 @@ class VoiceConversationalAI:
             api_key: OpenRouter API key
             voice: TTS voice to use
             speech_rate: Speech rate (e.g., "+20%" for faster)
+            llm_models: OpenRouter models raced for every question; the first to stream content is used.
+                Every extra model costs one more request per question, and reasoning models such as
+                DeepSeek-R1 stream their reasoning before any content, so they rarely win a race
+            history_cap: Number of recent turns kept in memory
+            history_db: SQLite file every turn is appended to (None to disable)
+            summary_model: Cheap OpenRouter model that summarizes turns older than the context window
+            barge_in: Stop the AI mid-reply when the user starts talking (use with headphones, otherwise
+                the microphone hears the AI's own voice)
         """
-        print("🚀 Initializing Voice Conversational AI System...")
+        # Console output goes through a queue so stdout writes happen on a background thread
+        _start_logging()
+        logger.info("🚀 Initializing Voice Conversational AI System...")
+        
+        # Fail on a missing API key before importing anything heavy, so the setup help shows instantly
+        from dotenv import load_dotenv
+        load_dotenv()
+        api_key = api_key or os.getenv("OPENROUTER_API_KEY")
+        if not api_key:
+            raise ValueError("API key not found! Please:\n"
+                             "1. Copy 'env_template' to '.env'\n"
+                             "2. Add your OpenRouter API key to the .env file\n"
+                             "3. Make sure .env file is in the same directory as this script")
+        
+        # The engines are imported here, not at module level, so the banner shows instantly;
+        # STT (torch/whisper) and TTS (edge-tts/pygame) share no heavy dependencies and load in parallel
+        # (STT_whisper only imports TTS_edge when it speaks itself, which it doesn't here)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as pool:
+            stt_module, tts_module = pool.map(importlib.import_module, ("STT_whisper", "TTS_edge"))
+        from semantic_cache import SemanticResponseCache
+        import requests
+        from requests.adapters import HTTPAdapter
+        
+        # One keep-alive HTTP session for every OpenRouter request of the session, with enough pooled
+        # connections for the raced model streams to run side by side
+        self._http = requests.Session()
+        self._http.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
         
         # Initialize Speech-to-Text engine
-        print("📱 Loading Speech-to-Text engine...")
-        self.stt_engine = ContinuousVoiceChat(api_key)
+        logger.info("📱 Loading Speech-to-Text engine...")
+        # The STT engine only listens and talks to the LLM; speaking is done here, sentence by sentence
+        self.stt_engine = stt_module.ContinuousVoiceChat(api_key, enable_voice_response=False,
+                                                         http_session=self._http)
+        if numpy_rms is not None:
+            # SIMD RMS for the audio level check (used when webrtcvad is not installed)
+            self.stt_engine.compute_rms = lambda samples: float(numpy_rms.rms(samples, window_size=samples.size)[0])
         
         # Initialize Text-to-Speech engine
-        print("🔊 Loading Text-to-Speech engine...")
-        self.tts_engine = EdgeTTSEngine(voice=voice, rate=speech_rate)
+        logger.info("🔊 Loading Text-to-Speech engine...")
+        self.tts_engine = tts_module.EdgeTTSEngine(voice=voice, rate=speech_rate)
+        
+        # Warm up both engines in the background while the user reads the banner: the STT engine already
+        # loads and warms up Whisper on its own thread, and the fixed phrases are rendered here (opening
+        # the edge-tts connection)
+        self._tts_warmup = self.tts_engine.prefetch([self.TEST_MESSAGE, self.GREETING, self.VOICE_ENABLED_MESSAGE,
+                                                     self.FAREWELL])
+        
+        # Semantic cache: near-duplicate questions are answered without calling the LLM
+        # (the embedding model loads in the background, off the startup path)
+        self.response_cache = SemanticResponseCache()
         
         # System settings
+        self.llm_models = tuple(dict.fromkeys(llm_models))
+        # Dedicated workers for blocking audio, model and network calls: one per raced model stream,
+        # plus the speaker, the barge-in listener, the history summarizer and a typed command
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=4 + len(self.llm_models),
+                                                           thread_name_prefix="va")
+        self._winning_llm_name = None
         self.enable_voice_responses = True
-        self.conversation_history = []
+        self.barge_in = barge_in
+        # Typed commands: one stdin reader thread per instance, feeding whichever conversation loop runs
+        self._stdin_reader = None
+        self._command_target = None
+        self._interrupted = threading.Event()
+        self._command_handlers = {
+            "mute voice": self._mute_voice,
+            "disable voice": self._mute_voice,
+            "enable voice": self._unmute_voice,
+            "unmute voice": self._unmute_voice,
+        }
+        # Recent turns stay in a bounded ring; the full log is appended to SQLite
+        self.history_cap = history_cap
+        self.conversation_history = collections.deque(maxlen=history_cap)
+        # The LLM sees every turn not yet summarized (at least the last _ctx_window) verbatim, plus a
+        # rolling summary of everything before them. _summary is (summary messages, turns it covers),
+        # replaced as a whole so the prompt never pairs a summary with the wrong turns
+        self._ctx_window = 8
+        self.summary_model = summary_model
+        self._summary = ([], 0)
+        self._turn_count = 0
+        self._summary_task = None
+        self._db = None
+        if history_db:
+            self._db = sqlite3.connect(history_db, isolation_level=None, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS turns(ts REAL, user TEXT, ai TEXT)")
         
-        print("✅ Voice Conversational AI System Ready!")
-        print(f"🎭 Using voice: {voice}")
-        print(f"⚡ Speech rate: {speech_rate}")
+        logger.info("✅ Voice Conversational AI System Ready!")
+        logger.info(f"🎭 Using voice: {voice}")
+        logger.info(f"⚡ Speech rate: {speech_rate}")
+    
+    def wait_until_warm(self, timeout=5):
+        """Wait up to timeout seconds in total for the startup warmup to finish; returns True if it did"""
+        deadline = time.monotonic() + timeout
+        self._tts_warmup.join(timeout)
+        stt_ready = self.stt_engine.wait_until_ready(max(0, deadline - time.monotonic()))
+        return stt_ready and not self._tts_warmup.is_alive()
     
-    def handle_conversation_turn(self):
-        """Handle one complete conversation turn: Listen → Transcribe → AI Response → Speak"""
+    async def handle_conversation_turn(self):
+        """Handle one complete conversation turn: Listen → Transcribe → AI Response → Speak
+
+        The AI response is streamed: each sentence is spoken as soon as it is complete while the
+        rest of the response is still being generated.
+        """
+        loop = asyncio.get_running_loop()
         try:
             # 1. Listen and record speech
-            print("\n🎯 === Voice Conversation Turn ===")
-            frames = self.stt_engine.record_until_silence()
+            logger.info("\n🎯 === Voice Conversation Turn ===")
+            frames = await loop.run_in_executor(self._pool, self.stt_engine.record_until_silence)
             
-            if not frames:
-                print("❌ No speech detected")
+            if frames is None:
+                logger.info("❌ No speech detected")
                 return False
             
             # 2. Transcribe speech to text
-            user_text = self.stt_engine.transcribe_direct(frames)
+            user_text = await loop.run_in_executor(self._pool, self.stt_engine.transcribe_direct, frames)
             
             if not user_text or len(user_text.strip()) <= 2:
-                print("❌ No clear speech detected")
+                logger.info("❌ No clear speech detected")
                 return False
             
-            # 3. Get AI response from DeepSeek
-            ai_response = self.stt_engine.ask_deepseek(user_text)
+            # 3 + 4. Answer from the semantic cache, or stream the AI response from DeepSeek and
+            # speak it sentence by sentence (while listening for the user cutting in, with barge-in on)
+            self._interrupted.clear()
+            stop_listening = threading.Event()
+            listener = None
+            if self.barge_in and self.enable_voice_responses:
+                listener = loop.run_in_executor(self._pool, self._listen_for_barge_in, stop_listening)
+            context_key = self._context_key(user_text)
+            try:
+                cached = await loop.run_in_executor(self._pool, self.response_cache.lookup, user_text, context_key)
+                if cached:
+                    ai_response = cached
+                    logger.info(f"🎙️ You: {user_text}")
+                    logger.info(f"🤖 AI (cached): {ai_response}")
+                    # Same interrupt as the streamed path: a barge-in before or during playback stops it
+                    if self.enable_voice_responses and not self._interrupted.is_set():
+                        await loop.run_in_executor(self._pool, self.tts_engine.speak, ai_response, False,
+                                                   self._interrupted)
+                else:
+                    ai_response = await self._stream_ai_response(user_text)
+            finally:
+                # The reply has finished playing: speech from here on starts the next turn, not a barge-in
+                if listener is not None:
+                    stop_listening.set()
+                    await listener
+            
+            if ai_response and not cached and not self._interrupted.is_set():
+                await loop.run_in_executor(self._pool, self.response_cache.store, user_text, ai_response,
+                                           context_key)
             
             if not ai_response:
-                print("❌ No AI response received")
+                logger.info("❌ No AI response received")
                 return False
             
-            # 4. Convert AI response to speech and play it
-            if self.enable_voice_responses:
-                print("🔊 Converting AI response to speech...")
-                success = self.tts_engine.speak(ai_response)
-                if success:
-                    print("✅ AI spoke the response successfully")
-                else:
-                    print("⚠️ Speech synthesis failed, but got text response")
-            
             # 5. Save conversation history
-            self.conversation_history.append({
-                "user": user_text,
-                "ai": ai_response,
-                "timestamp": time.time()
-            })
+            turn = Turn(user_text, ai_response, time.time(), self._interrupted.is_set())
+            if self._db is not None:
+                self._db.execute(INSERT_TURN, (turn.timestamp, turn.user, turn.ai))
+            self.conversation_history.append(turn)
+            self._turn_count += 1
+            
+            self._start_summary()
             
             return True
             
         except Exception as e:
-            print(f"❌ Error in conversation turn: {e}")
+            logger.info(f"❌ Error in conversation turn: {e}")
             return False
     
+    def _context_messages(self, user_text):
+        """Chat messages for user_text: the static system prompt, then the rolling summary, the last few
+        turns and the new question"""
+        summary_msg, covered = self._summary
+        # Turns stay verbatim until the summary covers them (capped in case summaries keep failing)
+        unsummarized = min(self._turn_count - covered, 3 * self._ctx_window)
+        recent = itertools.islice(reversed(self.conversation_history), max(unsummarized, 0))
+        history = []
+        for turn in reversed(list(recent)):
+            history.append({"role": "user", "content": turn.user})
+            # Tell the model where it was cut off so it doesn't simply repeat itself
+            reply = f"{turn.ai} [interrupted by the user]" if turn.interrupted else turn.ai
+            history.append({"role": "assistant", "content": reply})
+        return [_SYSTEM_MESSAGE, *summary_msg, *history, {"role": "user", "content": user_text}]
+    
+    def _start_summary(self):
+        """Once a window's worth of turns has left the context window, summarize them on a worker thread
+
+        Turns are only marked as summarized when a summary succeeds, so while one is still running (or
+        after one fails) they stay in the prompt and are folded into the next summary.
+        """
+        if self._summary_task is not None and not self._summary_task.done():
+            return
+        summary_msg, covered = self._summary
+        pending = self._turn_count - covered
+        if pending < 2 * self._ctx_window:
+            return
+        upto = self._turn_count - self._ctx_window
+        turns = list(itertools.islice(reversed(self.conversation_history), self._ctx_window, pending))
+        turns.reverse()
+        loop = asyncio.get_running_loop()
+        self._summary_task = loop.run_in_executor(self._pool, self._summarize, summary_msg, turns, upto)
+    
+    def _summarize(self, previous, turns, upto):
+        """Ask the summary model to fold turns into the previous summary, which then covers the first upto
+        turns; keeps the old summary on failure"""
+        transcript = "\n".join(f"User: {turn.user}\nAssistant: {turn.ai}" for turn in turns)
+        prompt = [*previous, {"role": "user", "content":
+                  "Update the summary of this conversation with the exchanges below. "
+                  "Reply with the summary only, in a few sentences.\n\n" + transcript}]
+        try:
+            response = self.stt_engine.open_chat_stream(prompt, model=self.summary_model)
+            if response is None:
+                return
+            with response:
+                summary = "".join(self.stt_engine.iter_chat_deltas(response)).strip()
+        except Exception as e:
+            logger.info(f"⚠️ Conversation summary failed: {e}")
+            return
+        if summary:
+            self._summary = ([{"role": "system", "content": f"Summary of the earlier conversation: {summary}"}], upto)
+    
+    def _context_key(self, user_text, turns=2):
+        """Cache context for user_text: empty for a self-contained question, so its answer can be reused
+        at any point, otherwise a hash of the last few turns it may refer back to"""
+        if not REFERS_BACK.search(user_text):
+            return ""
+        recent = reversed(list(itertools.islice(reversed(self.conversation_history), turns)))
+        text = "\n".join(f"{turn.user}\n{turn.ai}" for turn in recent)
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+    
+    def _listen_for_barge_in(self, stop_event):
+        """Worker thread: stop the AI's reply if the user starts talking before stop_event is set
+
+        The interrupting utterance is recorded to its end here and picked up by the next turn.
+        """
+        self.stt_engine.wait_for_speech(stop_event, on_speech=self._barge_in)
+    
+    def _barge_in(self):
+        """Called on the user's speech onset during a reply: stop speaking and generating at once"""
+        self._interrupted.set()
+        self.tts_engine.stop_speech()
+        logger.info("✋ Interrupted - listening to you")
+    
+    async def _stream_ai_response(self, user_text):
+        """Stream DeepSeek's reply, flushing complete sentences to TTS while tokens keep arriving"""
+        speech = asyncio.Queue()
+        speaker = asyncio.create_task(self._speak_in_order(speech)) if self.enable_voice_responses else None
+        
+        logger.info(f"🎙️ You: {user_text}")
+        logger.info("🤖 DeepSeek thinking...")
+        
+        parts = []
+        pending = ""
+        pending_tokens = 0
+        prefix = "🤖 AI: "
+        stream = self._race_llms(self._context_messages(user_text))
+        try:
+            async for delta in stream:
+                if self._interrupted.is_set():
+                    break
+                parts.append(delta)
+                pending += delta
+                pending_tokens += 1
+                
+                if FLUSH_POINT.search(pending) or pending_tokens >= MAX_PENDING_TOKENS:
+                    if pending.strip():
+                        # Show the reply one flushed chunk at a time, as it is handed to TTS
+                        logger.info(f"{prefix}{pending.strip()}")
+                        prefix = "       "
+                        if speaker:
+                            # Synthesis starts right away; _speak_in_order only keeps playback in order
+                            speech.put_nowait(self.tts_engine.synthesize(pending.strip()))
+                    pending = ""
+                    pending_tokens = 0
+            
+            if pending.strip():
+                logger.info(f"{prefix}{pending.strip()}")
+                if speaker:
+                    speech.put_nowait(self.tts_engine.synthesize(pending.strip()))
+            if self._winning_llm_name and len(self.llm_models) > 1:
+                logger.info(f"⚡ Fastest model: {self._winning_llm_name}")
+        except Exception as e:
+            logger.info(f"❌ AI request failed: {e}")
+            return None
+        finally:
+            # Closing the generator stops every model request that is still streaming
+            await stream.aclose()
+            if speaker:
+                speech.put_nowait(None)
+                await speaker
+        
+        ai_response = "".join(parts).strip()
+        return ai_response if ai_response else None
+    
+    async def _race_llms(self, messages):
+        """Send the prompt to every configured model at once and yield the reply of the first to stream
+
+        Each request runs on a worker thread. The first model to produce a token wins; the other
+        streams are closed at their next SSE line and their tokens are discarded.
+        """
+        loop = asyncio.get_running_loop()
+        tokens = asyncio.Queue()
+        lock = threading.Lock()
+        cancels = {model: threading.Event() for model in self.llm_models}
+        # Race state lives in this call only: branch threads of an earlier race that are still winding
+        # down never see this race's winner (self._winning_llm_name is just a report for the caller)
+        race = {"finished": 0, "winner": None}
+        errors = []
+        self._winning_llm_name = None
+        
+        def branch(model):
+            try:
+                response = self.stt_engine.open_chat_stream(messages, model=model)
+                if response is None:
+                    return
+                with response:
+                    for delta in self.stt_engine.iter_chat_deltas(response, cancel=cancels[model]):
+                        with lock:
+                            if race["winner"] is None:
+                                race["winner"] = model
+                                for other, cancel in cancels.items():
+                                    if other != model:
+                                        cancel.set()
+                        if race["winner"] != model:
+                            return
+                        loop.call_soon_threadsafe(tokens.put_nowait, delta)
+            except Exception as e:
+                errors.append(f"{model}: {e}")
+            finally:
+                # The winner ends the stream; without a winner, the last branch to give up does
+                with lock:
+                    race["finished"] += 1
+                    last = race["winner"] == model or (
+                        race["winner"] is None and race["finished"] == len(cancels))
+                if last:
+                    loop.call_soon_threadsafe(tokens.put_nowait, None)
+        
+        for model in self.llm_models:
+            loop.run_in_executor(self._pool, branch, model)
+        
+        try:
+            while True:
+                delta = await tokens.get()
+                if delta is None:
+                    break
+                self._winning_llm_name = race["winner"]
+                yield delta
+        finally:
+            # Stop every request that is still streaming (also when the consumer stops early)
+            for cancel in cancels.values():
+                cancel.set()
+        
+        if race["winner"] is None and errors:
+            raise RuntimeError("; ".join(errors))
+    
+    async def _speak_in_order(self, speech):
+        """Play queued syntheses one after another until a None sentinel arrives"""
+        loop = asyncio.get_running_loop()
+        spoke = False
+        while True:
+            audio = await speech.get()
+            if audio is None:
+                break
+            if self._interrupted.is_set():
+                audio.cancel()
+                continue
+            spoke = await loop.run_in_executor(self._pool, self.tts_engine.play, audio, self._interrupted) or spoke
+        if self._interrupted.is_set():
+            return
+        if spoke:
+            logger.info("✅ AI spoke the response successfully")
+        else:
+            logger.info("⚠️ Speech synthesis failed, but got text response")
+    
     def run_voice_conversation(self):
         """Run the continuous voice conversation loop"""
-        print("\n🎯 Voice Conversational AI Started!")
-        print("💡 How it works:")
-        print("   - Speak your question/message")
-        print("   - AI will respond with both text and voice")
-        print("   - Wait for the AI to finish speaking before your next turn")
-        print("   - Say 'mute voice' to disable AI speech")
-        print("   - Say 'enable voice' to re-enable AI speech")
-        print("⏹️  Press Ctrl+C to exit\n")
+        logger.info("\n🎯 Voice Conversational AI Started!")
+        logger.info("💡 How it works:")
+        logger.info("   - Speak your question/message")
+        logger.info("   - AI will respond with both text and voice")
+        logger.info("   - Wait for the AI to finish speaking before your next turn")
+        logger.info("   - Say 'mute voice' to disable AI speech")
+        logger.info("   - Say 'enable voice' to re-enable AI speech")
+        logger.info("   - Or type commands like /voice, /rate, /mute (type /help for the list)")
+        logger.info("⏹️  Press Ctrl+C to exit\n")
         
         try:
             # Initial greeting
             if self.enable_voice_responses:
-                greeting = "Hello! I'm your voice conversational AI assistant. I can hear you and speak back to you. What would you like to talk about?"
-                print("🤖 AI:", greeting)
-                self.tts_engine.speak(greeting)
+                logger.info(f"🤖 AI: {self.GREETING}")
+                self.tts_engine.speak(self.GREETING, cache=True)
             
+            asyncio.run(self._conversation_loop())
+        
+        except KeyboardInterrupt:
+            logger.info("\n👋 Voice conversation ended!")
+            
+            # Farewell message
+            if self.enable_voice_responses:
+                logger.info(f"🤖 AI: {self.FAREWELL}")
+                self.tts_engine.speak(self.FAREWELL, cache=True)
+            
+            self.show_conversation_summary()
+    
+    async def _conversation_loop(self):
+        """Run conversation turns on one event loop until interrupted, with typed commands handled alongside"""
+        loop = asyncio.get_running_loop()
+        commands = asyncio.Queue()
+        
+        # stdin is read on a daemon thread (works the same on Windows, where asyncio pipes over stdin don't)
+        self._command_target = (loop, commands)
+        if self._stdin_reader is None:
+            self._stdin_reader = threading.Thread(target=self._read_stdin, daemon=True)
+            self._stdin_reader.start()
+        dispatcher = asyncio.create_task(self._command_loop(commands))
+        try:
             while True:
-                print("\nListening... (speak now)")
+                logger.info("\nListening... (speak now)")
                 
                 # Handle one conversation turn
-                success = self.handle_conversation_turn()
+                success = await self.handle_conversation_turn()
                 
                 if success:
                     # Check for voice control commands
                     last_turn = self.conversation_history[-1]
-                    user_text = last_turn["user"].lower()
-                    
-                    if "mute voice" in user_text or "disable voice" in user_text:
-                        self.enable_voice_responses = False
-                        print("🔇 Voice responses disabled - AI will only respond with text")
-                    elif "enable voice" in user_text or "unmute voice" in user_text:
-                        self.enable_voice_responses = True
-                        print("🔊 Voice responses enabled - AI will speak responses")
-                        self.tts_engine.speak("Voice responses are now enabled again.")
+                    command = find_voice_command(lower_ascii(last_turn.user))
+                    if command:
+                        # Handlers may speak a confirmation, which blocks until it has played
+                        await loop.run_in_executor(self._pool, self._command_handlers[command])
                 
-                # Brief pause before next turn
-                time.sleep(1)
+                # Start listening as soon as playback has drained (immediate if it already has)
+                if not self.tts_engine.playback_finished.is_set():
+                    await loop.run_in_executor(self._pool, self.tts_engine.playback_finished.wait)
+        finally:
+            self._command_target = None
+            dispatcher.cancel()
+            # Let a recording blocked in a worker thread return so the loop can shut down
+            self.stt_engine.is_listening = False
+    
+    def _read_stdin(self):
+        """Reader thread: pass typed lines to the running conversation loop (dropped while none runs)"""
+        for line in sys.stdin:
+            target = self._command_target
+            if target is None:
+                continue
+            loop, commands = target
+            try:
+                loop.call_soon_threadsafe(commands.put_nowait, line)
+            except RuntimeError:
+                # The loop closed between the check and the call
+                pass
+    
+    async def _command_loop(self, commands):
+        """Run typed commands from the queue as they arrive"""
+        while True:
+            line = await commands.get()
+            try:
+                self._run_command(line.strip())
+            except Exception as e:
+                logger.info(f"❌ Command failed: {e}")
+    
+    def _run_command(self, line):
+        """Dispatch one typed /command directly, without going through speech recognition
+
+        Typed commands run while a voice turn is recording, so they confirm in text only: speaking
+        would be picked up by the microphone and sent to the AI as the user's question.
+        """
+        if not line.startswith("/"):
+            if line:
+                logger.info("💡 Commands start with '/', type /help for the list")
+            return
         
-        except KeyboardInterrupt:
-            print("\n👋 Voice conversation ended!")
-            
-            # Farewell message
-            if self.enable_voice_responses:
-                farewell = "Goodbye! It was nice talking with you."
-                print("🤖 AI:", farewell)
-                self.tts_engine.speak(farewell)
-            
-            self.show_conversation_summary()
+        name, _, argument = line[1:].partition(" ")
+        argument = argument.strip()
+        if name == "voice" and argument:
+            self.tts_engine.set_voice(argument)
+        elif name == "rate" and argument:
+            self.tts_engine.set_speed(argument)
+        elif name == "voices":
+            self.list_available_voices()
+        elif name == "mute":
+            self._mute_voice()
+        elif name == "unmute":
+            self._unmute_voice(announce=False)
+        else:
+            logger.info("⌨️ Commands:")
+            logger.info("   /voice <name>  - Change the TTS voice (e.g. /voice en-US-GuyNeural)")
+            logger.info("   /rate <rate>   - Change the speech rate (e.g. /rate +20%)")
+            logger.info("   /voices        - List available voices")
+            logger.info("   /mute          - Respond with text only")
+            logger.info("   /unmute        - Speak responses again")
+    
+    def _mute_voice(self):
+        """Voice command: respond with text only"""
+        self.enable_voice_responses = False
+        logger.info("🔇 Voice responses disabled - AI will only respond with text")
+    
+    def _unmute_voice(self, announce=True):
+        """Voice command: speak responses again (announce=True also says so out loud)"""
+        self.enable_voice_responses = True
+        logger.info("🔊 Voice responses enabled - AI will speak responses")
+        if announce:
+            self.tts_engine.speak(self.VOICE_ENABLED_MESSAGE, cache=True)
+    
+    def close(self):
+        """Release the worker pool, audio output, history database and HTTP session, then stop the console logger"""
+        if getattr(self, "_pool", None) is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if getattr(self, "tts_engine", None) is not None:
+            self.tts_engine.close()
+        if getattr(self, "_db", None) is not None:
+            self._db.close()
+            self._db = None
+        if getattr(self, "_http", None) is not None:
+            self._http.close()
+            self._http = None
+        _stop_logging()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def __del__(self):
+        """Cleanup"""
+        self.close()
     
     def show_conversation_summary(self):
         """Show a summary of the conversation"""
         if not self.conversation_history:
-            print("No conversation history to display.")
+            logger.info("No conversation history to display.")
             return
         
-        print(f"\n📊 Conversation Summary ({len(self.conversation_history)} exchanges):")
-        print("=" * 60)
+        logger.info(f"\n📊 Conversation Summary ({len(self.conversation_history)} exchanges):")
+        logger.info("=" * 60)
         
         for i, turn in enumerate(self.conversation_history, 1):
-            print(f"\nTurn {i}:")
-            print(f"🎙️ You: {turn['user']}")
-            print(f"🤖 AI: {turn['ai'][:100]}{'...' if len(turn['ai']) > 100 else ''}")
+            logger.info(f"\nTurn {i}:")
+            logger.info(f"🎙️ You: {turn.user}")
+            logger.info(f"🤖 AI: {turn.ai[:100]}{'...' if len(turn.ai) > 100 else ''}")
         
-        print("=" * 60)
-        print(f"Total conversation time: {len(self.conversation_history)} turns")
+        logger.info("=" * 60)
+        logger.info(f"Total conversation time: {len(self.conversation_history)} turns")
+    
+    def history_columns(self):
+        """The in-memory history as parallel columns (e.g. for pandas.DataFrame) instead of Turn objects"""
+        history = self.conversation_history
+        return {
+            "user": [turn.user for turn in history],
+            "ai": [turn.ai for turn in history],
+            "timestamp": [turn.timestamp for turn in history],
+            "interrupted": [turn.interrupted for turn in history],
+        }
     
     def change_voice(self, voice_name):
         """Change the TTS voice"""
         self.tts_engine.set_voice(voice_name)
         # Test the new voice
-        self.tts_engine.speak(f"Voice changed to {voice_name}. How do I sound now?")
+        self.tts_engine.speak(f"Voice changed to {voice_name}. How do I sound now?", cache=True)
     
     def change_speech_rate(self, rate):
         """Change speech rate"""
         self.tts_engine.set_speed(rate)
-        self.tts_engine.speak(f"Speech rate changed. I'm now speaking at {rate} speed.")
+        self.tts_engine.speak(f"Speech rate changed. I'm now speaking at {rate} speed.", cache=True)
     
     def list_available_voices(self):
         """List available voices"""
@@ -171,56 +726,65 @@ class VoiceConversationalAI:
     
     def test_voice_system(self):
         """Test the complete voice system"""
-        print("🧪 Testing complete voice system...")
+        logger.info("🧪 Testing complete voice system...")
         
         # Test TTS
-        test_message = "Hello! This is a test of the complete voice conversational AI system. I can hear you and speak back to you!"
-        print("🔊 Testing Text-to-Speech...")
-        tts_success = self.tts_engine.speak(test_message)
+        logger.info("🔊 Testing Text-to-Speech...")
+        tts_success = self.tts_engine.speak(self.TEST_MESSAGE, cache=True)
         
         if tts_success:
-            print("✅ Voice system test successful!")
+            logger.info("✅ Voice system test successful!")
             return True
         else:
-            print("❌ Voice system test failed")
+            logger.info("❌ Voice system test failed")
             return False
 
 
 def main():
     """Main function to run the voice conversational AI"""
-    print("🎙️ Welcome to Voice Conversational AI System!")
-    print("=" * 60)
-    print("🚀 Features:")
-    print("   ✅ Real-time speech recognition")
-    print("   ✅ AI-powered responses via DeepSeek-R1")
-    print("   ✅ Natural voice synthesis")
-    print("   ✅ Continuous voice conversation")
-    print("=" * 60)
+    # Everything goes through the queued logger so the console keeps its order
+    _start_logging()
+    logger.info("🎙️ Welcome to Voice Conversational AI System!")
+    logger.info("=" * 60)
+    logger.info("🚀 Features:")
+    logger.info("   ✅ Real-time speech recognition")
+    logger.info("   ✅ AI-powered responses via DeepSeek-R1")
+    logger.info("   ✅ Natural voice synthesis")
+    logger.info("   ✅ Continuous voice conversation")
+    logger.info("=" * 60)
     
     try:
         # Initialize the system
-        ai_system = VoiceConversationalAI()
-        
-        # Test the voice system first
-        print("\n🧪 Testing voice system...")
-        test_success = ai_system.test_voice_system()
-        
-        if not test_success:
-            print("⚠️ Voice test failed, but continuing with text-only responses...")
-            ai_system.enable_voice_responses = False
-        
-        # Start the voice conversation
-        ai_system.run_voice_conversation()
+        with VoiceConversationalAI() as ai_system:
+            # Let the model warmup finish before the first real use
+            if not ai_system.wait_until_warm(timeout=5):
+                logger.info("⏳ Warmup still running, continuing anyway...")
+            
+            # Test the voice system first
+            logger.info("\n🧪 Testing voice system...")
+            test_success = ai_system.test_voice_system()
+            
+            if not test_success:
+                logger.info("⚠️ Voice test failed, but continuing with text-only responses...")
+                ai_system.enable_voice_responses = False
+            
+            # Start the voice conversation
+            ai_system.run_voice_conversation()
         
     except ValueError as e:
-        print(f"❌ Setup Error: {e}")
-        print("\n🔧 Quick Fix Options:")
-        print("1. Create 'api_key.txt' file with your OpenRouter API key")
-        print("2. Or set environment variable: set OPENROUTER_API_KEY=your_key")
-        print("3. Make sure you have installed all dependencies: pip install -r requirements.txt")
+        # close() may have stopped the listener on the way out; restart it for the help text
+        _start_logging()
+        logger.info(f"❌ Setup Error: {e}")
+        logger.info("\n🔧 Quick Fix Options:")
+        logger.info("1. Create 'api_key.txt' file with your OpenRouter API key")
+        logger.info("2. Or set environment variable: set OPENROUTER_API_KEY=your_key")
+        logger.info("3. Make sure you have installed all dependencies: pip install -r requirements.txt")
     except Exception as e:
-        print(f"❌ Error: {e}")
-        print("Make sure all dependencies are installed: pip install -r requirements.txt")
+        _start_logging()
+        logger.info(f"❌ Error: {e}")
+        logger.info("Make sure all dependencies are installed: pip install -r requirements.txt")
+    finally:
+        _stop_logging()
 
 
 if __name__ == "__main__":